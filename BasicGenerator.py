@@ -1,5 +1,4 @@
-import math
-import random
+import numpy as np
 
 from BasicIcon import BasicIcon
 from IGenerator import IGenerator
@@ -10,25 +9,54 @@ class BasicGenerator(IGenerator):
     def __init__(self, numtypes, seed=None):
 
         self.__numtypes = numtypes
+        self.__rng = np.random.default_rng(seed)
 
     def getJewelTypes(self):
         return self.__numtypes
 
     def generate(self):
-        generate = BasicIcon(math.floor(random.randint(0, self.__numtypes)))
-        return generate
+        return BasicIcon(int(self.__rng.integers(self.__numtypes)))
+
+    def generateTypes(self, n):
+        return self.__rng.integers(0, self.__numtypes, size=n, dtype=np.int8)
 
     def initialize(self, grid, randIcons=True):
+        height, width = grid.shape
+        n = self.getJewelTypes()
+
+        if randIcons:
+            # Each icon avoids the type that would complete a run with its
+            # two left or two upper neighbours, so the grid starts without runs.
+            for i in range(height):
+                for j in range(width):
+                    forbidden = set()
+                    if j >= 2 and grid[i, j - 1] == grid[i, j - 2]:
+                        forbidden.add(int(grid[i, j - 1]))
+                    if i >= 2 and grid[i - 1, j] == grid[i - 2, j]:
+                        forbidden.add(int(grid[i - 1, j]))
+                    if len(forbidden) >= n:
+                        forbidden.clear()
+
+                    t = int(self.__rng.integers(n - len(forbidden)))
+                    for f in sorted(forbidden):
+                        if t >= f:
+                            t += 1
+                    grid[i, j] = t
+            return
+
+        # Pattern state at the start of each row, and the pair of icons of each row.
+        patterns = np.empty(height, dtype=bool)
+        icons = np.empty((height, 2), dtype=np.int8)
+
         pattern = False
         icon1 = 0
         icon2 = 1
 
-        for i in range(len(grid)):
+        for i in range(height):
             pattern = not pattern
 
             if pattern is False:
                 icon1 = icon1 + 1
-                n = self.getJewelTypes()
 
                 icon1 = icon1 % n
                 if icon1 == icon2:
@@ -37,11 +65,12 @@ class BasicGenerator(IGenerator):
                 if icon1 == icon2:
                     icon2 = (icon1 + 1) % n
 
-            for j in range(len(grid[0])):
-                if randIcons is False:
-                    grid[i][j] = BasicIcon(icon1 if pattern else icon2)
-
-                else:
-                    grid[i][j] = self.generate()
+            patterns[i] = pattern
+            icons[i] = (icon1, icon2)
 
+            # the pattern flips once per cell along the row
+            if width % 2 == 1:
                 pattern = not pattern
+
+        cols = np.indices(grid.shape)[1]
+        grid[:] = np.where(patterns[:, None] ^ (cols % 2 == 1), icons[:, :1], icons[:, 1:])
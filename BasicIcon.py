@@ -16,6 +16,8 @@ from Icon import Icon
 # Basic implementation of the Icon interface.
 #
 class BasicIcon(Icon):
+    __slots__ = ('__type',)
+
     ##
     # Constructs an icon of the given type.
     # @param type
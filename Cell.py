@@ -19,15 +19,18 @@ from Icon import Icon
 # row for the icon.
 #
 class Cell(object):
+    __slots__ = ('__row', '__col', '__icon', '__previousRow')
+
     ##
     # Constructs a Cell with the given row, column, and Icon.
-    # The previous row is the same as the given row.
+    # The previous row is the same as the given row, unless given.
     #
     # @param row row for this cell.
     # @param col column for this cell.
     # @param icon the Icon in this cell.
+    # @param previousRow previous row for this cell.
     #
-    def __init__(self, row, col, icon):
+    def __init__(self, row, col, icon, previousRow=None):
         ## Row for this cell.
         self.__row = row
         ## Column for this cell.
@@ -35,7 +38,7 @@ class Cell(object):
         ## Icon in this cell.
         self.__icon = icon
         ## Previous row for this cell, if applicable.
-        self.__previousRow = row
+        self.__previousRow = row if previousRow is None else previousRow
 
     ##
     # Returns the previous row for this cell.
@@ -20,11 +20,22 @@ from Cell import Cell
 from IGame import IGame
 from IGenerator import IGenerator
 from Icon import Icon
+from BasicIcon import BasicIcon
 from BasicGenerator import BasicGenerator
 import logging
 import math
 import numpy as np
 
+try:  # compiled kernels, built with setup_game_core.py
+    import game_core
+except ImportError:
+    game_core = None
+
+try:  # requires numba
+    import game_jit
+except ImportError:
+    game_jit = None
+
 
 ##
 # Concrete implementation of the IGame interface. This implementation
@@ -47,6 +58,13 @@ class GameImpl(IGame):
     __BASE_SCORE = 10
     ## Turn debugging on or off.
     __DEBUG__ = False
+    ## Icon type stored in the grid for an empty cell.
+    NULL = -1
+    ## Symbols used by __repr__, indexed by icon type modulo 8.
+    __SYMBOLS = np.frombuffer(b"!@+*$%#.", dtype=np.uint8)
+    ## Result of __findRunsArrays when there are no runs.
+    __NO_RUNS = (np.empty(0, dtype=np.int16), np.empty(0, dtype=np.int16),
+                 np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int16))
 
     ##
     # Constructs a game with the given number of columns and rows
@@ -61,25 +79,43 @@ class GameImpl(IGame):
 
         self.__width = width
         self.__height = height
-        ## The grid of icons for this game.
-        self.__grid = [[None for y in range(width)] for x in range(height)]
+        ## The grid of icon types for this game, with NULL for empty cells.
+        self.__grid = np.empty((height, width), dtype=np.int8)
+
+        ## Icon generator.
+        self.__generator = generator
+
+        ## Score awarded for a run, indexed by the run length.
+        self.__runScores = np.zeros(max(width, height) + 1, dtype=np.int64)
+        self.__runScores[3:] = GameImpl.__BASE_SCORE << np.arange(self.__runScores.size - 3)
+
+        ## Compiled run finding kernels, if any: whole grid, and rows and columns of two cells.
+        if game_core is not None:
+            self.__runKernel = game_core.find_runs
+            self.__localRunKernel = game_core.has_run_local
+        elif game_jit is not None:
+            self.__runKernel = game_jit.find_runs
+            self.__localRunKernel = game_jit.has_run_local
+        else:
+            self.__runKernel = None
+            self.__localRunKernel = None
+        ## Horizontal and vertical run lengths written by the compiled kernel.
+        self.__hlen = np.zeros((height, width), dtype=np.int16)
+        self.__vlen = np.zeros((height, width), dtype=np.int16)
 
         # Initialize the grid.
         generator.initialize(self.__grid, True)
 
         ## Current score of the game.
         self.__score = 0
-        while len(self.findRuns(False)) > 0:
+        ## BasicGenerator grids start without runs, so this is a single check;
+        ## runs left by other generators are still removed here.
+        while self.__findRunsArrays()[3].size > 0:
             self.removeAllRuns()
 
         ##Reset score.
         self.__score = 0
 
-        ## Icon generator.
-        self.__generator = generator
-
-        # ...
-
     ## Remove all runs from the grid.
 
     def removeAllRuns(self):
@@ -87,18 +123,15 @@ class GameImpl(IGame):
         rem = self.findRuns(True)
         c.append(rem)
         if len(rem) > 0:
-            a = []
-            b = []
-            for i in range(0, self.__width):
-                a = a + (self.collapseColumn(i))
-                b = b + (self.fillColumn(i))
+            a = self.__compactColumns()
+            b = self.__fillNulls()
 
             c.append(a)
             c.append(b)
 
-        if self.setDebug:
+        if self.getDebug:
             print("Cells = ", self.toString(c))
-            print("Score = %d", self.__score)
+            print("Score = %d" % self.__score)
 
         return c
 
@@ -119,7 +152,8 @@ class GameImpl(IGame):
     # @return Icon at the given row and column
     #
     def getIcon(self, row, col):
-        return self.__grid[row][col]
+        t = self.__grid[row, col]
+        return None if t == GameImpl.NULL else BasicIcon(int(t))
 
     ## Sets the Icon at the given location in the game grid.
     #
@@ -128,8 +162,7 @@ class GameImpl(IGame):
     # @param icon to be set in (row,col).
     #
     def setIcon(self, row, col, icon):
-        icon = self.__grid[row][col]
-        return icon
+        self.__grid[row, col] = GameImpl.NULL if icon is None else icon.getType()
 
     ## Returns the number of columns in the game grid.
     #
@@ -167,7 +200,8 @@ class GameImpl(IGame):
     #  @param (k,l) second icon.
     #
     def swapIcons(self, i, j, k, l):
-        [self.__grid[i][j], self.__grid[k][l]] = [self.__grid[k][l], self.__grid[i][j]]
+        g = self.__grid
+        g[i, j], g[k, l] = g[k, l], g[i, j]
 
     ##
     # In this implementation, the only possible move is a swap
@@ -189,25 +223,56 @@ class GameImpl(IGame):
     #
     def select(self, cells):
 
-        if self.setDebug:
+        if len(cells) != 2:
+            return False
+
+        if self.getDebug:
             print("select")
-            print("Cell 0 = %s", cells[0].toString())
-            print("Cell 1 = %s", cells[1].toString())
-
-        if (len(cells) == 2) and cells[0].isAdjacent(cells[1]) \
-                and (not cells[0].getIcon()).__eq__(cells[1].getIcon()) \
-                and cells[0].inGrid(self.getWidth(), self.getHeight()) \
-                and cells[1].inGrid(self.getWidth(), self.getHeight()):
-            self.swapCells(cells)
+            print("Cell 0 = %s" % cells[0])
+            print("Cell 1 = %s" % cells[1])
+
+        r0, c0 = cells[0].row(), cells[0].col()
+        r1, c1 = cells[1].row(), cells[1].col()
+        dr = r0 - r1
+        dc = c0 - c1
+        h = self.__height
+        w = self.__width
+        g = self.__grid
+
+        ## Adjacent, inside the grid, and with different icon types.
+        if (dr * dr + dc * dc == 1) & (0 <= r0 < h) & (0 <= r1 < h) & (0 <= c0 < w) & (0 <= c1 < w) \
+                and g[r0, c0] != g[r1, c1]:
+            self.swapIcons(r0, c0, r1, c1)
             validSelection = True
-            if len(self.findRuns(False)) == 0:
-                self.swapCells(cells)
+            if self.__localRunKernel is not None:
+                found = self.__localRunKernel(g, r0, c0, r1, c1)
+            else:
+                found = self.__findRunsLocal(r0, c0, r1, c1)
+            if not found:
+                self.swapIcons(r0, c0, r1, c1)
                 validSelection = False
         else:
             validSelection = False
 
         return validSelection
 
+    ##
+    # Returns whether there is a run in the rows or columns of two cells.
+    # After swapping two cells, these are the only lines where a new run
+    # may appear. NumPy version of the compiled has_run_local kernels.
+    #
+    # @param (r0,c0) first cell.
+    # @param (r1,c1) second cell.
+    # @return True if any of those rows or columns contains a run.
+    #
+    def __findRunsLocal(self, r0, c0, r1, c1):
+        g = self.__grid
+        lines = [g[r] for r in {r0, r1}] + [g[:, c] for c in {c0, c1}]
+        for line in lines:
+            if ((line[:-2] == line[1:-1]) & (line[1:-1] == line[2:]) & (line[:-2] != GameImpl.NULL)).any():
+                return True
+        return False
+
     ## Returns a list of all cells forming part of a vertical or horizontal run.
     # The list is in no particular order and may contain duplicates.
     # If the argument is False, no modification is made to the game state;
@@ -219,14 +284,63 @@ class GameImpl(IGame):
     # @f$[c_1, c_2, c_3,...], \text{where } c_i = Cell(row_i, col_i, iconType_i)@f$
     #
     def findRuns(self, doMarkAndUpdateScore):
+        rows, cols, types, lens = self.__findRunsArrays()
 
-        c = []
-        
-        self.doMarkAndUpdateScore = False
+        if doMarkAndUpdateScore:
+            self.__grid[rows, cols] = GameImpl.NULL
+            self.__score += int(self.__runScores[lens].sum())
 
-    
+        return [Cell(r, k, BasicIcon(t)) for r, k, t in zip(rows.tolist(), cols.tolist(), types.tolist())]
 
-        return c
+    ##
+    # Returns all cells forming part of a vertical or horizontal run
+    # as parallel arrays, without modifying the game state.
+    #
+    # @return rows, columns and icon types of the cells in runs,
+    #         and the length of each run.
+    #
+    def __findRunsArrays(self):
+        g = self.__grid
+        if self.__runKernel is not None:
+            if self.__runKernel(g, self.__hlen, self.__vlen) == 0:
+                return GameImpl.__NO_RUNS
+            hrows, hcols = np.nonzero(self.__hlen)
+            vrows, vcols = np.nonzero(self.__vlen)
+            hlens = self.__hlen[hrows, hcols]
+            vlens = self.__vlen[vrows, vcols]
+        else:
+            ## Triples of equal, non-null icons starting at each cell.
+            hmask = (g[:, :-2] == g[:, 1:-1]) & (g[:, 1:-1] == g[:, 2:]) & (g[:, :-2] != GameImpl.NULL)
+            vmask = (g[:-2, :] == g[1:-1, :]) & (g[1:-1, :] == g[2:, :]) & (g[:-2, :] != GameImpl.NULL)
+
+            hrows, hcols, hlens = GameImpl.__mergeTriples(hmask)
+            vcols, vrows, vlens = GameImpl.__mergeTriples(vmask.T)
+
+        ## Expand each run into the positions of its cells.
+        lens = np.concatenate((hlens, vlens)).astype(np.int16)
+        if lens.size == 0:
+            return GameImpl.__NO_RUNS
+        offsets = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+        nh = hlens.sum()
+        rows = np.repeat(np.concatenate((hrows, vrows)).astype(np.int16), lens)
+        cols = np.repeat(np.concatenate((hcols, vcols)).astype(np.int16), lens)
+        cols[:nh] += offsets[:nh]
+        rows[nh:] += offsets[nh:]
+
+        return rows, cols, g[rows, cols], lens
+
+    ##
+    # Merges overlapping triples, in each line of a mask, into runs.
+    #
+    # @param mask boolean array, True where a triple starts.
+    # @return line, starting position and length of each run.
+    #
+    @staticmethod
+    def __mergeTriples(mask):
+        edges = np.diff(np.pad(mask, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+        lines, starts = np.nonzero(edges == 1)
+        ends = np.nonzero(edges == -1)[1]
+        return lines, starts, ends - starts + 2
 
     ##
     # Removes an element at index pos, in a given column col, from the grid.
@@ -237,10 +351,13 @@ class GameImpl(IGame):
     # @param col column of pos.
     #
     def removeAndShiftUp(self, pos, col):
-        for i in range(pos, 1, -1):
-            self.setIcon(i, col, self.getIcon(i - 1, col))
+        if game_core is not None:
+            game_core.remove_and_shift_up(self.__grid, pos, col)
+            return
 
-        return self.setIcon(0, col, None)
+        column = self.__grid[:, col]
+        column[1:pos + 1] = column[0:pos]
+        column[0] = GameImpl.NULL
 
     ##
     #  Collapses the icons in the given column of the current game grid
@@ -255,44 +372,86 @@ class GameImpl(IGame):
     #  @f$[c_1, c_2, c_3,...], \text{where } c_i = Cell(row_i, col_i, iconType_i)@f$
     #
     def collapseColumn(self, col):
-        ## Array that contains all the changed cells.
+        if game_core is not None:
+            c = []
+            for r, k, t, p in game_core.collapse_column(self.__grid, col):
+                a = Cell(r, k, BasicIcon(t), p)
+                c.append(a)
+            return c
+
+        return self.__compactColumn(col)[1]
+
+    ##
+    # Moves the non-null icons of a column toward the bottom,
+    # leaving null cells at the top.
+    #
+    # @param col column to be compacted.
+    # @return number of null cells at the top of the column,
+    #         and the list of cells for moved icons.
+    #
+    def __compactColumn(self, col):
+        column = self.__grid[:, col]
+
+        ## Original rows of the non-null icons, from top to bottom.
+        keep = np.flatnonzero(column != GameImpl.NULL)
+        types = column[keep]
+
+        ## Number of null cells, which all go to the top.
+        n = self.__height - keep.size
+        column[:n] = GameImpl.NULL
+        column[n:] = types
+
+        ## Only icons whose row changed are reported.
+        rows = np.arange(n, self.__height)
+        moved = rows != keep
 
         c = []
+        for r, p, t in zip(rows[moved].tolist(), keep[moved].tolist(), types[moved].tolist()):
+            a = Cell(r, col, BasicIcon(t), p)
+            c.append(a)
 
-        ## Get the last column index.
+        return n, c
 
-        i = self.getHeight() - 1
+    ##
+    # Moves the non-null icons of every column toward the bottom,
+    # processing all columns at once with a stable sort on the null mask.
+    #
+    # @return list of cells for moved icons.
+    #
+    def __compactColumns(self):
+        g = self.__grid
 
-        ##Holds how many cells were removed to shift down the cells above it.
+        ## Original row of the icon that ends up in each cell.
+        order = np.argsort(g != GameImpl.NULL, axis=0, kind='stable')
+        g[:] = np.take_along_axis(g, order, axis=0)
 
-        j = 0
+        ## Only non-null icons whose row changed are reported.
+        rows, cols = np.nonzero((order != np.arange(self.__height)[:, None]) & (g != GameImpl.NULL))
+        prev = order[rows, cols]
+        types = g[rows, cols]
 
-        ## Check i >= j, because every cell from 0 to j is null(the ones on the top).
-        ## As such, there is no need to proceed.
-        while i >= j:
-            ##if the cell is not null
-            if self.getIcon(i, col) is not None:
-                ## create a changed cell, that was moved "j" rows
-                a = Cell(i, col, self.getIcon(i, col))
-                a.previousRow(i - j)
-                ## check if a was moved, if so, add it to "c"
-                if a.row() != a.previousRow():
-                    c.append(a)
+        c = []
+        for r, k, p, t in zip(rows.tolist(), cols.tolist(), prev.tolist(), types.tolist()):
+            a = Cell(r, k, BasicIcon(t), p)
+            c.append(a)
 
-                ## move one position up in the column and continue
-                i = i - 1
-                continue
+        return c
 
-            ## If it is not on the first row,
-            ## call "removeAndShiftUp", so the null cell goes to the top.
-            if i != 0:
-                self.removeAndShiftUp(i, col)
+    ##
+    # Fills all null locations of the grid with new icons,
+    # drawing their types from the generator in a single batch.
+    #
+    # @return list of cells for the new icons.
+    #
+    def __fillNulls(self):
+        rows, cols = np.nonzero(self.__grid == GameImpl.NULL)
+        types = self.__generator.generateTypes(rows.size)
+        self.__grid[rows, cols] = types
 
-            ## Increase j,if the cell was null.
-            if Cell is None:
-                a = Cell(j, col, None)
-                c.append(a)
-                j = j + 1
+        c = []
+        for r, k, t in zip(rows.tolist(), cols.tolist(), types.tolist()):
+            a = Cell(r, k, BasicIcon(t), -1)
+            c.append(a)
 
         return c
 
@@ -307,22 +466,26 @@ class GameImpl(IGame):
     def fillColumn(self, col):
         ## variable that contains all changed cell
         c = []
-        n = 0
-
-        ## for each row in column
-        for i in range(self.getHeight() - 1, 0, -1):
-            ## check if the icon is null, if so, generate a new random icon to fill the position
-            if self.getIcon(i, col) is None:
-                icon = self.__generator
-                self.setIcon(i, col, icon)
-                a = Cell(i, col, icon)
-                a.previousRow(n - 1)
+        grid = self.__grid
+
+        if game_core is not None:
+            for r, k, t in game_core.fill_column(grid, col, self.__generator):
+                a = Cell(r, k, BasicIcon(t), -1)
                 c.append(a)
+        else:
+            ## for each row in column
+            for i in range(self.__height):
+                ## check if the icon is null, if so, generate a new random icon to fill the position
+                if grid[i, col] == GameImpl.NULL:
+                    icon = self.__generator.generate()
+                    grid[i, col] = icon.getType()
+                    a = Cell(i, col, icon, -1)
+                    c.append(a)
 
         if self.getDebug and len(c) > 0:
-            print("\nfillColumn %s", col)
+            print("\nfillColumn %s" % col)
             print("Cells = " + self.toString(c))
-            print("Grid = \n%s", self.__str__())
+            print("Grid = \n%s" % self)
 
         return c
 
@@ -331,24 +494,18 @@ class GameImpl(IGame):
     # with rows delimited by newlines.
     #
     def __str__(self):
-        sb = ""
-        for row in range(self.getHeight()):
-            for col in range(self.getWidth()):
-                icon = self.getIcon(row, col)
-                sb += "%s" % ("*" if icon is None else str(icon)).rjust(3, ' ')
-            sb += "\n"
-        return sb
+        labels = np.char.rjust(self.__grid.astype(str), 3)
+        labels[self.__grid == GameImpl.NULL] = "  *"
+        return "".join(["".join(row) + "\n" for row in labels.tolist()])
 
     ## Return a string representation of the grid, with 8 symbols:
     # - 01234567
     # - '!@+*$%#.'
     def __repr__(self):
-        sb = " ".join(list(map(str, range(self.getWidth())))) + "\n\n"
-        for i in range(self.getHeight()):
-            for j in range(self.getWidth()):
-                sb += "!@+*$%#."[self.getIcon(i, j).getType() % 8] + " "
-            sb += "  " + str(i) + "\n"
-        return sb
+        chars = np.full((self.__height, self.__width, 2), ord(" "), dtype=np.uint8)
+        chars[:, :, 0] = np.take(GameImpl.__SYMBOLS, self.__grid % 8)
+        rows = [chars[i].tobytes().decode() + "  " + str(i) for i in range(self.__height)]
+        return " ".join(map(str, range(self.__width))) + "\n\n" + "\n".join(rows) + "\n"
 
     ##
     # Returns a String representation of a List of cells.
@@ -16,6 +16,8 @@ except ImportError:  # python 2
 
     ABC = object
 
+import numpy as np
+
 
 ##
 # Interface representing a utility for generating new icons
@@ -31,10 +33,20 @@ class IGenerator(ABC):
     def generate(self): pass
 
     ##
-    # Initializes a given 2D array of Icons with new values.
+    # Initializes a given 2D array of icon types with new values.
     # Any existing values in the array are overwritten.
     # @param grid
     #   the 2D array to be initialized
     #
     @abstractmethod
     def initialize(self, grid): pass
+
+    ##
+    # Returns the types of n new Icons.
+    # @param n
+    #   number of icons
+    # @return
+    #   int8 array with the n types
+    #
+    def generateTypes(self, n):
+        return np.array([self.generate().getType() for _ in range(n)], dtype=np.int8)
@@ -24,6 +24,8 @@ except ImportError:  # python 2
 # icon encapsulates an integer, referred to as its "type".
 #
 class Icon(ABC):
+    __slots__ = ()
+
     ##
     # Returns the type of this icon.
     # @return
@@ -0,0 +1,198 @@
+# cython: language_level=3
+#
+## @package game_core
+#
+#  Compiled grid kernels for GameImpl.
+#
+#  Typed loops over the int8 grid of icon types, used by GameImpl
+#  whenever this extension has been built with:
+#  <pre>
+#  python setup_game_core.py build_ext --inplace
+#  </pre>
+#
+#  @see GameImpl
+#
+cimport cython
+from libc.stdint cimport int8_t, int16_t
+
+## Icon type stored in the grid for an empty cell (GameImpl.NULL).
+cdef enum:
+    NULL_TYPE = -1
+
+
+##
+# Records the length of every horizontal and vertical run at its first cell.
+#
+# @param grid grid of icon types.
+# @param hlen output array, set to the length of the horizontal run
+#        starting at each cell, or 0.
+# @param vlen output array, set to the length of the vertical run
+#        starting at each cell, or 0.
+# @return number of runs found.
+#
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef Py_ssize_t find_runs(int8_t[:, ::1] grid, int16_t[:, ::1] hlen, int16_t[:, ::1] vlen):
+    cdef Py_ssize_t h = grid.shape[0], w = grid.shape[1]
+    cdef Py_ssize_t i, j, k, x
+    cdef Py_ssize_t n = 0
+    cdef int8_t t
+
+    # horizontal runs
+    for i in range(h):
+        j = 0
+        while j < w:
+            t = grid[i, j]
+            k = j + 1
+            while k < w and grid[i, k] == t:
+                k += 1
+            for x in range(j, k):
+                hlen[i, x] = 0
+            if t != NULL_TYPE and k - j >= 3:
+                hlen[i, j] = <int16_t> (k - j)
+                n += 1
+            j = k
+
+    # vertical runs
+    for j in range(w):
+        i = 0
+        while i < h:
+            t = grid[i, j]
+            k = i + 1
+            while k < h and grid[k, j] == t:
+                k += 1
+            for x in range(i, k):
+                vlen[x, j] = 0
+            if t != NULL_TYPE and k - i >= 3:
+                vlen[i, j] = <int16_t> (k - i)
+                n += 1
+            i = k
+
+    return n
+
+
+##
+# Returns whether a row of the grid contains a run.
+#
+# @param grid grid of icon types.
+# @param r row to be scanned.
+# @return True if the row contains a run.
+#
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline bint row_has_run(int8_t[:, ::1] grid, Py_ssize_t r):
+    cdef Py_ssize_t j, run = 1
+    for j in range(1, grid.shape[1]):
+        if grid[r, j] == grid[r, j - 1] and grid[r, j] != NULL_TYPE:
+            run += 1
+            if run == 3:
+                return True
+        else:
+            run = 1
+    return False
+
+
+##
+# Returns whether a column of the grid contains a run.
+#
+# @param grid grid of icon types.
+# @param c column to be scanned.
+# @return True if the column contains a run.
+#
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline bint col_has_run(int8_t[:, ::1] grid, Py_ssize_t c):
+    cdef Py_ssize_t i, run = 1
+    for i in range(1, grid.shape[0]):
+        if grid[i, c] == grid[i - 1, c] and grid[i, c] != NULL_TYPE:
+            run += 1
+            if run == 3:
+                return True
+        else:
+            run = 1
+    return False
+
+
+##
+# Returns whether there is a run in the rows or columns of two cells.
+# A line shared by both cells is scanned once.
+#
+# @param grid grid of icon types.
+# @param (r0,c0) first cell.
+# @param (r1,c1) second cell.
+# @return True if any of those rows or columns contains a run.
+#
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef bint has_run_local(int8_t[:, ::1] grid, Py_ssize_t r0, Py_ssize_t c0, Py_ssize_t r1, Py_ssize_t c1):
+    if row_has_run(grid, r0) or (r1 != r0 and row_has_run(grid, r1)):
+        return True
+    return col_has_run(grid, c0) or (c1 != c0 and col_has_run(grid, c1))
+
+
+##
+# Removes the element at row pos of column col, shifting down all
+# elements above it and nulling the first cell of the column.
+#
+# @param grid grid of icon types.
+# @param pos the position at which the element should be removed.
+# @param col column of pos.
+#
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef void remove_and_shift_up(int8_t[:, ::1] grid, Py_ssize_t pos, Py_ssize_t col):
+    cdef Py_ssize_t i
+    for i in range(pos, 0, -1):
+        grid[i, col] = grid[i - 1, col]
+    grid[0, col] = NULL_TYPE
+
+
+##
+# Moves the non-null icons of a column toward the bottom.
+#
+# @param grid grid of icon types.
+# @param col column to be collapsed.
+# @return list of (row, col, type, previousRow) tuples for the moved icons.
+#
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef list collapse_column(int8_t[:, ::1] grid, Py_ssize_t col):
+    cdef Py_ssize_t i, j = grid.shape[0] - 1
+    cdef int8_t t
+    cdef list moved = []
+
+    for i in range(grid.shape[0] - 1, -1, -1):
+        t = grid[i, col]
+        if t == NULL_TYPE:
+            continue
+        if i != j:
+            grid[j, col] = t
+            grid[i, col] = NULL_TYPE
+            moved.append((j, col, t, i))
+        j -= 1
+
+    return moved
+
+
+##
+# Fills the null locations of a column with icons from a generator.
+#
+# @param grid grid of icon types.
+# @param col column to be filled.
+# @param generator IGenerator used to create the new icons.
+# @return list of (row, col, type) tuples for the new icons.
+#
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef list fill_column(int8_t[:, ::1] grid, Py_ssize_t col, generator):
+    cdef Py_ssize_t i
+    cdef int8_t t
+    cdef list filled = []
+
+    for i in range(grid.shape[0]):
+        if grid[i, col] == NULL_TYPE:
+            t = generator.generate().getType()
+            grid[i, col] = t
+            filled.append((i, col, t))
+
+    return filled
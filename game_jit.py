@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding: UTF-8
+#
+## @package game_jit
+#
+#  Numba-compiled run finding kernel for GameImpl.
+#
+#  Importing this module requires numba; GameImpl falls back to
+#  NumPy when it is not installed.
+#
+#  @see GameImpl
+#
+from numba import njit, prange
+
+## Icon type stored in the grid for an empty cell (GameImpl.NULL).
+NULL = -1
+
+
+##
+# Records the length of every horizontal and vertical run at its first cell.
+# Rows are scanned in parallel for horizontal runs, then columns for vertical
+# runs, so each thread only writes its own row or column of the outputs.
+#
+# @param grid grid of icon types.
+# @param hlen output array, set to the length of the horizontal run
+#        starting at each cell, or 0.
+# @param vlen output array, set to the length of the vertical run
+#        starting at each cell, or 0.
+# @return number of runs found.
+#
+@njit(cache=True, parallel=True)
+def find_runs(grid, hlen, vlen):
+    h, w = grid.shape
+    n = 0
+
+    for i in prange(h):
+        j = 0
+        while j < w:
+            t = grid[i, j]
+            k = j + 1
+            while k < w and grid[i, k] == t:
+                k += 1
+            for x in range(j, k):
+                hlen[i, x] = 0
+            if t != NULL and k - j >= 3:
+                hlen[i, j] = k - j
+                n += 1
+            j = k
+
+    for j in prange(w):
+        i = 0
+        while i < h:
+            t = grid[i, j]
+            k = i + 1
+            while k < h and grid[k, j] == t:
+                k += 1
+            for x in range(i, k):
+                vlen[x, j] = 0
+            if t != NULL and k - i >= 3:
+                vlen[i, j] = k - i
+                n += 1
+            i = k
+
+    return n
+
+
+##
+# Returns whether a row of the grid contains a run.
+#
+# @param grid grid of icon types.
+# @param r row to be scanned.
+# @return True if the row contains a run.
+#
+@njit(cache=True)
+def row_has_run(grid, r):
+    run = 1
+    for j in range(1, grid.shape[1]):
+        if grid[r, j] == grid[r, j - 1] and grid[r, j] != NULL:
+            run += 1
+            if run == 3:
+                return True
+        else:
+            run = 1
+    return False
+
+
+##
+# Returns whether a column of the grid contains a run.
+#
+# @param grid grid of icon types.
+# @param c column to be scanned.
+# @return True if the column contains a run.
+#
+@njit(cache=True)
+def col_has_run(grid, c):
+    run = 1
+    for i in range(1, grid.shape[0]):
+        if grid[i, c] == grid[i - 1, c] and grid[i, c] != NULL:
+            run += 1
+            if run == 3:
+                return True
+        else:
+            run = 1
+    return False
+
+
+##
+# Returns whether there is a run in the rows or columns of two cells.
+# A line shared by both cells is scanned once.
+#
+# @param grid grid of icon types.
+# @param (r0,c0) first cell.
+# @param (r1,c1) second cell.
+# @return True if any of those rows or columns contains a run.
+#
+@njit(cache=True)
+def has_run_local(grid, r0, c0, r1, c1):
+    if row_has_run(grid, r0) or (r1 != r0 and row_has_run(grid, r1)):
+        return True
+    return col_has_run(grid, c0) or (c1 != c0 and col_has_run(grid, c1))
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# coding: UTF-8
+#
+## @package setup_game_core
+#
+#  Builds the game_core Cython extension used by GameImpl.
+#
+#  Usage: python setup_game_core.py build_ext --inplace
+#
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='game_core',
+    ext_modules=cythonize('game_core.pyx', language_level=3),
+)
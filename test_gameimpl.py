@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# coding: UTF-8
+#
+## @package test_gameimpl
+#
+#  Tests for GameImpl against a brute-force scan of the grid,
+#  once for each available run finding backend: NumPy, and the
+#  game_jit (numba) and game_core (Cython) kernels when importable.
+#
+#  Usage: python -m unittest test_gameimpl
+#
+import unittest
+
+import numpy as np
+
+import GameImpl as gameimpl
+from GameImpl import GameImpl
+from BasicGenerator import BasicGenerator
+from BasicIcon import BasicIcon
+from Cell import Cell
+
+try:
+    import game_jit
+except ImportError:
+    game_jit = None
+
+try:
+    import game_core
+except ImportError:
+    game_core = None
+
+
+##
+# Returns the positions of all cells in runs, and the score of those runs.
+#
+# @param g grid of icon types, with -1 for null cells.
+# @return set of (row, col) positions and the total score.
+#
+def bruteRuns(g):
+    height, width = g.shape
+    cells = set()
+    score = 0
+    lines = [[(i, j) for j in range(width)] for i in range(height)] + \
+            [[(i, j) for i in range(height)] for j in range(width)]
+    for line in lines:
+        start = 0
+        while start < len(line):
+            end = start
+            while end < len(line) and g[line[end]] == g[line[start]]:
+                end += 1
+            if g[line[start]] != GameImpl.NULL and end - start >= 3:
+                score += 10 << (end - start - 3)
+                cells.update(line[start:end])
+            start = end
+    return cells, score
+
+
+##
+# Tests shared by all backends. Subclasses select the kernels that
+# GameImpl picks up at construction.
+#
+class GameImplTests(object):
+    ## game_core module used by the backend, or None.
+    core = None
+    ## game_jit module used by the backend, or None.
+    jit = None
+
+    def setUp(self):
+        self.saved = (gameimpl.game_core, gameimpl.game_jit)
+        gameimpl.game_core = self.core
+        gameimpl.game_jit = self.jit
+
+    def tearDown(self):
+        gameimpl.game_core, gameimpl.game_jit = self.saved
+
+    ## Returns a game with the given grid of icon types.
+    def makeGame(self, g):
+        height, width = g.shape
+        game = GameImpl(width, height, BasicGenerator(3, 0))
+        for i in range(height):
+            for j in range(width):
+                game.setIcon(i, j, None if g[i, j] == GameImpl.NULL else BasicIcon(int(g[i, j])))
+        return game
+
+    ## Returns the grid of icon types of a game.
+    def grid(self, game):
+        return np.array([[GameImpl.NULL if game.getIcon(i, j) is None else game.getIcon(i, j).getType()
+                          for j in range(game.getWidth())] for i in range(game.getHeight())])
+
+    ## Returns random grids, with a few null cells.
+    def grids(self, n=100, numtypes=3):
+        rng = np.random.default_rng(1)
+        for _ in range(n):
+            height, width = rng.integers(1, 10, 2)
+            g = rng.integers(0, numtypes, (height, width))
+            g[rng.random((height, width)) < 0.05] = GameImpl.NULL
+            yield g
+
+    def testFindRuns(self):
+        for g in self.grids():
+            game = self.makeGame(g)
+            cells, score = bruteRuns(g)
+
+            found = game.findRuns(False)
+            self.assertEqual({(c.row(), c.col()) for c in found}, cells)
+            for c in found:
+                self.assertEqual(c.getIcon().getType(), g[c.row(), c.col()])
+            self.assertEqual(self.grid(game).tolist(), g.tolist())
+
+            before = game.getScore()
+            game.findRuns(True)
+            self.assertEqual(game.getScore() - before, score)
+            for i, j in cells:
+                self.assertIsNone(game.getIcon(i, j))
+
+    def testSelect(self):
+        for g in self.grids(300, 4):
+            ## select expects a grid without runs, as left by removeAllRuns.
+            g[g == GameImpl.NULL] = 0
+            if bruteRuns(g)[0]:
+                continue
+            height, width = g.shape
+            game = self.makeGame(g)
+
+            ## Every adjacent pair, plus pairs that are diagonal or out of the grid.
+            pairs = [((r, c), (r + dr, c + dc)) for r in range(height) for c in range(width)
+                     for dr, dc in ((0, 1), (1, 0), (1, 1))]
+            pairs += [((-1, 0), (0, 0)), ((height - 1, width - 1), (height - 1, width))]
+
+            for (r0, c0), (r1, c1) in pairs:
+                expected = False
+                if 0 <= r1 < height and 0 <= c1 < width and 0 <= r0 \
+                        and abs(r0 - r1) + abs(c0 - c1) == 1 and g[r0, c0] != g[r1, c1]:
+                    swapped = g.copy()
+                    swapped[r0, c0], swapped[r1, c1] = g[r1, c1], g[r0, c0]
+                    expected = len(bruteRuns(swapped)[0]) > 0
+
+                self.assertEqual(game.select([Cell(r0, c0, None), Cell(r1, c1, None)]), expected)
+                if expected:
+                    self.assertEqual(self.grid(game).tolist(), swapped.tolist())
+                    game.swapIcons(r0, c0, r1, c1)
+                self.assertEqual(self.grid(game).tolist(), g.tolist())
+
+    def testCollapseAndFillColumn(self):
+        for g in self.grids():
+            game = self.makeGame(g)
+            game.findRuns(True)
+            marked = self.grid(game)
+            height, width = g.shape
+
+            for col in range(width):
+                column = marked[:, col]
+                kept = column[column != GameImpl.NULL].tolist()
+                moved = game.collapseColumn(col)
+                after = self.grid(game)[:, col]
+
+                self.assertEqual(after.tolist(), [GameImpl.NULL] * (height - len(kept)) + kept)
+                for c in moved:
+                    self.assertNotEqual(c.row(), c.previousRow)
+                    self.assertEqual(c.getIcon().getType(), column[c.previousRow])
+                    self.assertEqual(c.getIcon().getType(), after[c.row()])
+
+                filled = game.fillColumn(col)
+                self.assertEqual(sorted(c.row() for c in filled), list(range(height - len(kept))))
+                for c in filled:
+                    self.assertEqual(c.previousRow, -1)
+                    self.assertEqual(c.getIcon().getType(), game.getIcon(c.row(), col).getType())
+
+    def testRemoveAndShiftUp(self):
+        g = np.array([[0], [1], [2], [0]])
+        game = self.makeGame(g)
+        game.removeAndShiftUp(2, 0)
+        self.assertEqual(self.grid(game)[:, 0].tolist(), [GameImpl.NULL, 0, 1, 0])
+
+
+class NumPyBackendTest(GameImplTests, unittest.TestCase):
+    pass
+
+
+@unittest.skipIf(game_jit is None, "numba is not installed")
+class NumbaBackendTest(GameImplTests, unittest.TestCase):
+    jit = game_jit
+
+
+@unittest.skipIf(game_core is None, "game_core is not built")
+class CythonBackendTest(GameImplTests, unittest.TestCase):
+    core = game_core
+
+
+if __name__ == '__main__':
+    unittest.main()